@@ -1,9 +1,9 @@
-from typing import Any, Dict
-
+import gevent
 import pytest
 
-from raiden.network.rpc.client import JSONRPCClient
+from raiden.network.rpc.client import EthTransfer, JSONRPCClient, gas_price_for_fast_transaction
 from raiden.tests.utils.smartcontracts import deploy_rpc_test_contract
+from raiden.utils.typing import BlockNumber
 
 pytestmark = pytest.mark.usefixtures("skip_if_not_parity")
 
@@ -23,24 +23,52 @@
 def test_parity_request_pruned_data_raises_an_exception(deploy_client: JSONRPCClient) -> None:
     """ Interacting with an old block identifier with a pruning client throws. """
     contract_proxy, _ = deploy_rpc_test_contract(deploy_client, "RpcWithStorageTest")
-    iterations = 1000
+    # The pruning configuration above is aggressive enough that a few storage
+    # writes are sufficient for the old state to be discarded.
+    iterations = 50
 
-    def send_transaction() -> Dict[str, Any]:
-        estimated_transaction = deploy_client.estimate_gas(
-            contract_proxy, "waste_storage", {}, iterations
-        )
-        assert estimated_transaction
-        transaction = deploy_client.transact(estimated_transaction)
-        return deploy_client.poll_transaction(transaction)
+    estimated_transaction = deploy_client.estimate_gas(
+        contract_proxy, "waste_storage", {}, iterations
+    )
+    assert estimated_transaction
 
-    first_receipt = send_transaction()
+    first_receipt = deploy_client.poll_transaction(deploy_client.transact(estimated_transaction))
     pruned_block_number = first_receipt["blockNumber"]
 
-    for _ in range(10):
-        send_transaction()
+    # The block above only has to fall out of the state history. Parity's
+    # authority round engine seals blocks on its own and has no `evm_mine`,
+    # so cheap ether transfers to ourselves are used to keep changing the
+    # state, instead of more calls to `waste_storage`.
+    #
+    # All transactions are submitted before waiting for any of them. The
+    # nonces are allocated upfront, so the greenlets don't contend on the
+    # nonce lock and can send the transactions concurrently.
+    self_transfer = EthTransfer(
+        to_address=deploy_client.address,
+        value=0,
+        gas_price=gas_price_for_fast_transaction(deploy_client.web3),
+    )
+    slots = [deploy_client.allocate_next_slot(self_transfer) for _ in range(10)]
+    greenlets = [gevent.spawn(slot.send_transaction) for slot in slots]
+    gevent.joinall(greenlets, raise_error=True)
+
+    # Transactions from the same account are mined in nonce order, once the
+    # transaction with the highest nonce is mined all the others are too. So
+    # instead of polling for each receipt only the last one is waited for.
+    last_receipt = deploy_client.poll_transaction(greenlets[-1].get())
+
+    # The transactions are not mined one per block anymore, make sure the
+    # pruned block is older than the state history kept by the client.
+    deploy_client.wait_until_block(
+        BlockNumber(last_receipt["blockNumber"] + STATE_PRUNING["pruning-history"] + 1)
+    )
 
-    with pytest.raises(ValueError):
-        contract_proxy.functions.const().call(block_identifier=pruned_block_number)
+    # The probes are independent, query the pruned state concurrently
+    probes = [
+        gevent.spawn(contract_proxy.functions.const().call, block_identifier=pruned_block_number),
+        gevent.spawn(contract_proxy.functions.get(1).call, block_identifier=pruned_block_number),
+    ]
+    gevent.joinall(probes)
 
-    with pytest.raises(ValueError):
-        contract_proxy.functions.get(1).call(block_identifier=pruned_block_number)
+    for probe in probes:
+        assert isinstance(probe.exception, ValueError)
@@ -3,6 +3,7 @@
 from collections import namedtuple
 from hashlib import sha256
 from itertools import cycle
+from unittest.mock import patch
 
 import pytest
 from eth_utils import keccak
@@ -1762,6 +1763,35 @@ def test_receive_withdraw_request():
     )
 
 
+def test_receive_withdraw_request_rejects_before_recovering_signature():
+    pseudo_random_generator = random.Random()
+
+    our_model1, _ = create_model(balance=70)
+    partner_model1, privkey2 = create_model(balance=100)
+    channel_state = create_channel_from_models(our_model1, partner_model1, privkey2)
+
+    withdraw_request = ReceiveWithdrawRequest(
+        message_identifier=message_identifier_from_prng(pseudo_random_generator),
+        canonical_identifier=channel_state.canonical_identifier,
+        total_withdraw=120,
+        signature=make_32bytes(),
+        # pylint: disable=no-member
+        sender=channel_state.partner_state.address,
+        participant=channel_state.partner_state.address,
+        # pylint: enable=no-member
+        nonce=1,
+        expiration=10,
+    )
+
+    with patch("raiden.transfer.channel.recover") as recover:
+        result = channel.is_valid_withdraw_request(
+            channel_state=channel_state, withdraw_request=withdraw_request
+        )
+        assert result.fail
+        assert result.as_error_message.startswith("Insufficient balance"), result
+        assert not recover.called
+
+
 def test_receive_withdraw_confirmation():
     pseudo_random_generator = random.Random()
 
@@ -344,9 +344,7 @@ def test_regression_mediator_task_no_routes():
         sender_end_state=channels[0].partner_state,
         locked_lock=lock,
         pseudo_random_generator=pseudo_random_generator,
-        chain_id=channels[0].chain_id,
-        token_network_address=channels[0].token_network_address,
-        channel_identifier=channels[0].identifier,
+        canonical_identifier=channels[0].canonical_identifier,
         recipient=channels[0].our_state.address,
     )
     assert send_lock_expired
@@ -548,9 +546,7 @@ def test_regression_onchain_secret_reveal_must_update_channel_state():
         sender_end_state=payer_channel.partner_state,
         locked_lock=lock,
         pseudo_random_generator=pseudo_random_generator,
-        chain_id=payer_channel.chain_id,
-        token_network_address=payer_channel.token_network_address,
-        channel_identifier=payer_channel.identifier,
+        canonical_identifier=payer_channel.canonical_identifier,
         recipient=payer_channel.our_state.address,
     )
     assert send_lock_expired
@@ -1,6 +1,7 @@
 import random
 from dataclasses import replace
 from hashlib import sha256
+from unittest.mock import DEFAULT, patch
 
 from eth_utils import keccak
 
@@ -17,6 +18,7 @@
     make_transaction_hash,
 )
 from raiden.transfer import channel
+from raiden.transfer.architecture import TransitionResult
 from raiden.transfer.channel import (
     compute_locksroot,
     get_batch_unlock_gain,
@@ -38,10 +40,19 @@
     UnlockPartialProofState,
 )
 from raiden.transfer.state_change import (
+    ActionChannelClose,
     ActionChannelSetRevealTimeout,
+    ActionChannelWithdraw,
     Block,
     ContractReceiveChannelBatchUnlock,
+    ContractReceiveChannelClosed,
+    ContractReceiveChannelDeposit,
     ContractReceiveChannelSettled,
+    ContractReceiveChannelWithdraw,
+    ContractReceiveUpdateTransfer,
+    ReceiveWithdrawConfirmation,
+    ReceiveWithdrawExpired,
+    ReceiveWithdrawRequest,
 )
 from raiden.utils.copy import deepcopy
 from raiden.utils.mediation_fees import prepare_mediation_fee_config
@@ -270,6 +281,20 @@ def test_is_balance_proof_usable_onchain_answer_is_false():
     assert str(factories.UINT256_MAX + 1) in msg, msg
 
 
+def test_is_balance_proof_usable_onchain_rejects_before_recovering_signature():
+    channel_state = factories.make_channel_set(number_of_channels=1).channels[0]
+    balance_proof_wrong_channel = factories.create(factories.BalanceProofSignedStateProperties())
+
+    with patch("raiden.transfer.channel.recover") as recover:
+        is_valid_balance_proof = is_balance_proof_usable_onchain(
+            received_balance_proof=balance_proof_wrong_channel,
+            channel_state=channel_state,
+            sender_state=channel_state.partner_state,
+        )
+        assert is_valid_balance_proof.fail
+        assert not recover.called, "Invalid fields must be rejected before the signature"
+
+
 def test_is_valid_balanceproof_signature():
     balance_proof = factories.create(factories.BalanceProofSignedStateProperties())
     valid = is_valid_balanceproof_signature(balance_proof, factories.make_address())
@@ -282,6 +307,17 @@ def test_is_valid_balanceproof_signature():
     assert not valid, f"Invalid signature check: {valid.as_error_message}"
 
 
+def test_is_valid_balanceproof_signature_covers_balance_data():
+    balance_proof = factories.create(factories.BalanceProofSignedStateProperties())
+    assert is_valid_balanceproof_signature(balance_proof, balance_proof.sender)
+
+    # The stored balance_hash is left untouched, the signature must be checked
+    # against the amounts that are actually applied to the channel
+    balance_proof.transferred_amount += 1
+    valid = is_valid_balanceproof_signature(balance_proof, balance_proof.sender)
+    assert not valid, "Signature must not cover a different transferred amount"
+
+
 def test_get_secret():
     secret1 = factories.make_secret()
     secret2 = factories.make_secret()
@@ -307,6 +343,17 @@ def test_get_secret():
     assert get_secret(end_state, secrethash4) is None  # unknown secrethash
 
 
+def test_compute_locks_without():
+    lock1, lock2, lock3 = (factories.make_lock() for _ in range(3))
+    pending_locks = PendingLocksState([lock1.encoded, lock2.encoded, lock3.encoded])
+
+    without_lock2 = channel.compute_locks_without(pending_locks, lock2.encoded)
+    assert without_lock2 == PendingLocksState([lock1.encoded, lock3.encoded])
+    assert len(pending_locks.locks) == 3, "The original pending locks must not be mutated"
+
+    assert channel.compute_locks_without(without_lock2, lock2.encoded) is None
+
+
 def test_get_status():
     failed_status = TransactionExecutionStatus(
         finished_block_number=10, result=TransactionExecutionStatus.FAILURE
@@ -323,6 +370,23 @@ def test_get_status():
     assert get_status(settle_failed) == ChannelState.STATE_UNUSABLE
 
 
+def test_is_channel_usable_skips_distributable_for_closed_channel():
+    closed_channel = factories.create(
+        factories.NettingChannelStateProperties(
+            close_transaction=TransactionExecutionStatus(
+                finished_block_number=10, result=TransactionExecutionStatus.SUCCESS
+            )
+        )
+    )
+
+    with patch("raiden.transfer.channel.get_distributable") as get_distributable:
+        usability = channel.is_channel_usable_for_new_transfer(
+            closed_channel, transfer_amount=1, lock_timeout=None
+        )
+        assert usability is channel.ChannelUsability.NOT_OPENED
+        assert not get_distributable.called
+
+
 def test_set_settled():
     channel = factories.create(
         factories.NettingChannelStateProperties(
@@ -481,3 +545,45 @@ def test_update_channel_reveal_timeout():
     )
 
     assert iteration.new_state.reveal_timeout == valid_reveal_timeout
+
+
+def test_state_transition_dispatches_to_the_matching_handler():
+    handler_names = {
+        Block: "handle_block",
+        ActionChannelClose: "handle_action_close",
+        ActionChannelWithdraw: "handle_action_withdraw",
+        ActionChannelSetRevealTimeout: "handle_action_set_reveal_timeout",
+        ContractReceiveChannelClosed: "handle_channel_closed",
+        ContractReceiveUpdateTransfer: "handle_channel_updated_transfer",
+        ContractReceiveChannelSettled: "handle_channel_settled",
+        ContractReceiveChannelDeposit: "handle_channel_deposit",
+        ContractReceiveChannelBatchUnlock: "handle_channel_batch_unlock",
+        ContractReceiveChannelWithdraw: "handle_channel_withdraw",
+        ReceiveWithdrawRequest: "handle_receive_withdraw_request",
+        ReceiveWithdrawConfirmation: "handle_receive_withdraw_confirmation",
+        ReceiveWithdrawExpired: "handle_receive_withdraw_expired",
+    }
+    assert set(handler_names) == set(channel.STATE_CHANGE_HANDLERS)
+
+    channel_state = factories.create(factories.NettingChannelStateProperties())
+    for state_change_type, handler_name in handler_names.items():
+        # The handlers are mocked, the state change is only used as the
+        # dispatch key and forwarded as is
+        state_change = state_change_type.__new__(state_change_type)
+
+        with patch.multiple(
+            channel, **{name: DEFAULT for name in handler_names.values()}
+        ) as mocks:
+            mocks[handler_name].return_value = TransitionResult(None, [])
+            channel.state_transition(
+                channel_state=channel_state,
+                state_change=state_change,
+                block_number=1,
+                block_hash=make_block_hash(),
+                pseudo_random_generator=random.Random(),
+            )
+
+        called = [name for name, mock in mocks.items() if mock.called]
+        assert called == [handler_name], state_change_type
+        call_args, call_kwargs = mocks[handler_name].call_args
+        assert state_change in call_args or state_change in call_kwargs.values()
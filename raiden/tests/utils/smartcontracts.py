@@ -1,3 +1,4 @@
+import functools
 import os
 
 from solc import compile_files
@@ -188,15 +189,22 @@ def compile_files_cwd(*args: Any, **kwargs: Any) -> Dict[str, Any]:
     return compiled_contracts
 
 
-def deploy_rpc_test_contract(deploy_client: JSONRPCClient, name: str):
+@functools.lru_cache(maxsize=None)
+def _load_rpc_test_artifact(name: str) -> Dict[str, Any]:
+    """ Compile the test contract `name` only once, the sources don't change
+    during a test session and only the deployment has to be done per test.
+    """
     contract_path = os.path.abspath(
         os.path.join(os.path.dirname(__file__), "..", "smart_contracts", f"{name}.sol")
     )
     contracts = compile_files_cwd([contract_path])
     contract_key = os.path.basename(contract_path) + ":" + name
+    return contracts[contract_key]
 
+
+def deploy_rpc_test_contract(deploy_client: JSONRPCClient, name: str):
     contract_proxy, receipt = deploy_client.deploy_single_contract(
-        contract_name=name, contract=contracts[contract_key]
+        contract_name=name, contract=_load_rpc_test_artifact(name)
     )
 
     return contract_proxy, receipt
@@ -85,15 +85,15 @@
 from raiden.utils.packing import pack_balance_proof, pack_withdraw
 from raiden.utils.signer import recover
 from raiden.utils.typing import (
-    MYPY_ANNOTATION,
     Address,
+    Any,
     Balance,
     BlockExpiration,
     BlockHash,
     BlockNumber,
     BlockTimeout,
-    ChainID,
-    ChannelID,
+    Callable,
+    Dict,
     EncodedData,
     InitiatorAddress,
     List,
@@ -112,8 +112,8 @@
     Signature,
     TargetAddress,
     TokenAmount,
-    TokenNetworkAddress,
     Tuple,
+    Type,
     Union,
     WithdrawAmount,
 )
@@ -122,7 +122,8 @@
     # pylint: disable=unused-import
     from raiden.raiden_service import RaidenService  # noqa: F401
 
-# This should be changed to `Union[str, PendingLocksState]`
+# Error message when invalid, new pending locks when valid. This should be
+# changed to `Union[str, PendingLocksState]`
 PendingLocksStateOrError = Tuple[bool, Optional[str], Optional[PendingLocksState]]
 EventsOrError = Tuple[bool, List[Event], Optional[str]]
 BalanceProofData = Tuple[Locksroot, Nonce, TokenAmount, LockedAmount]
@@ -243,9 +244,6 @@ def is_channel_usable_for_new_transfer(
     linearly with the number of locks in it, this has to be limited to a value
     lower than the block gas limit constraints.
     """
-    pending_transfers = get_number_of_pending_transfers(channel_state.our_state)
-    distributable = get_distributable(channel_state.our_state, channel_state.partner_state)
-
     lock_timeout_valid = lock_timeout is None or (
         lock_timeout <= channel_state.settle_timeout
         and lock_timeout > channel_state.reveal_timeout
@@ -266,9 +264,13 @@ def is_channel_usable_for_new_transfer(
     if not is_valid_settle_timeout:
         return ChannelUsability.INVALID_SETTLE_TIMEOUT
 
-    if pending_transfers >= MAXIMUM_PENDING_TRANSFERS:
+    if get_number_of_pending_transfers(channel_state.our_state) >= MAXIMUM_PENDING_TRANSFERS:
         return ChannelUsability.CHANNEL_REACHED_PENDING_LIMIT
 
+    # The distributable is the most expensive value to compute, it is only
+    # needed once the cheaper checks above passed. This matters for the
+    # initiator, which runs this check for every candidate route.
+    distributable = get_distributable(channel_state.our_state, channel_state.partner_state)
     if transfer_amount > distributable:
         return ChannelUsability.CHANNEL_DOESNT_HAVE_ENOUGH_DISTRIBUTABLE
 
@@ -432,9 +434,9 @@ def is_valid_amount(
     end_state: NettingChannelEndState,
     amount: Union[TokenAmount, PaymentAmount, PaymentWithFeeAmount],
 ) -> bool:
-    (_, _, current_transferred_amount, current_locked_amount) = get_current_balanceproof(end_state)
-
-    transferred_amount_after_unlock = current_transferred_amount + current_locked_amount + amount
+    transferred_amount_after_unlock = (
+        end_state.transferred_amount + get_amount_locked(end_state) + amount
+    )
 
     return transferred_amount_after_unlock <= UINT256_MAX
 
@@ -476,11 +478,7 @@ def is_valid_balanceproof_signature(
         nonce=balance_proof.nonce,
         balance_hash=balance_hash,
         additional_hash=balance_proof.message_hash,
-        canonical_identifier=CanonicalIdentifier(
-            chain_identifier=balance_proof.chain_id,
-            token_network_address=balance_proof.token_network_address,
-            channel_identifier=balance_proof.channel_identifier,
-        ),
+        canonical_identifier=balance_proof.canonical_identifier,
     )
 
     return is_valid_signature(
@@ -488,6 +486,37 @@ def is_valid_balanceproof_signature(
     )
 
 
+def _canonical_identifier_mismatch(
+    received_balance_proof: BalanceProofSignedState, channel_state: NettingChannelState
+) -> SuccessOrError:
+    if received_balance_proof.channel_identifier != channel_state.identifier:
+        # Informational message, the channel_identifier **validated by the
+        # signature** must match for the balance_proof to be valid.
+        return SuccessOrError(
+            f"channel_identifier does not match. "
+            f"expected: {channel_state.identifier} "
+            f"got: {received_balance_proof.channel_identifier}."
+        )
+
+    elif received_balance_proof.token_network_address != channel_state.token_network_address:
+        # Informational message, the token_network_address **validated by
+        # the signature** must match for the balance_proof to be valid.
+        return SuccessOrError(
+            f"token_network_address does not match. "
+            f"expected: {to_checksum_address(channel_state.token_network_address)} "
+            f"got: {to_checksum_address(received_balance_proof.token_network_address)}."
+        )
+
+    else:
+        # Informational message, the chain_id **validated by the signature**
+        # must match for the balance_proof to be valid.
+        return SuccessOrError(
+            f"chain_id does not match channel's "
+            f"chain_id. expected: {channel_state.chain_id} "
+            f"got: {received_balance_proof.chain_id}."
+        )
+
+
 def is_balance_proof_usable_onchain(
     received_balance_proof: BalanceProofSignedState,
     channel_state: NettingChannelState,
@@ -506,10 +535,6 @@ def is_balance_proof_usable_onchain(
     """
     expected_nonce = get_next_nonce(sender_state)
 
-    is_valid_signature = is_valid_balanceproof_signature(
-        received_balance_proof, sender_state.address
-    )
-
     # TODO: Accept unlock messages if the node has not yet sent a transaction
     # with the balance proof to the blockchain, this will save one call to
     # unlock on-chain for the non-closing party.
@@ -518,32 +543,10 @@ def is_balance_proof_usable_onchain(
         # balance proof cannot be used onchain.
         return SuccessOrError("The channel is already closed.")
 
-    elif received_balance_proof.channel_identifier != channel_state.identifier:
-        # Informational message, the channel_identifier **validated by the
-        # signature** must match for the balance_proof to be valid.
-        return SuccessOrError(
-            f"channel_identifier does not match. "
-            f"expected: {channel_state.identifier} "
-            f"got: {received_balance_proof.channel_identifier}."
-        )
-
-    elif received_balance_proof.token_network_address != channel_state.token_network_address:
-        # Informational message, the token_network_address **validated by
-        # the signature** must match for the balance_proof to be valid.
-        return SuccessOrError(
-            f"token_network_address does not match. "
-            f"expected: {to_checksum_address(channel_state.token_network_address)} "
-            f"got: {to_checksum_address(received_balance_proof.token_network_address)}."
-        )
-
-    elif received_balance_proof.chain_id != channel_state.chain_id:
-        # Informational message, the chain_id **validated by the signature**
-        # must match for the balance_proof to be valid.
-        return SuccessOrError(
-            f"chain_id does not match channel's "
-            f"chain_id. expected: {channel_state.chain_id} "
-            f"got: {received_balance_proof.chain_id}."
-        )
+    elif received_balance_proof.canonical_identifier != channel_state.canonical_identifier:
+        # The canonical identifier is compared as a whole, which is the common
+        # case, the individual fields are only inspected to build the error.
+        return _canonical_identifier_mismatch(received_balance_proof, channel_state)
 
     elif not is_balance_proof_safe_for_onchain_operations(received_balance_proof):
         transferred_amount_after_unlock = (
@@ -564,8 +567,9 @@ def is_balance_proof_usable_onchain(
 
     else:
         # The signature must be valid, otherwise the balance proof cannot be
-        # used onchain.
-        return is_valid_signature
+        # used onchain. This is the most expensive check, so it is done last,
+        # after the cheap field comparisons above rejected invalid messages.
+        return is_valid_balanceproof_signature(received_balance_proof, sender_state.address)
 
 
 def is_valid_lockedtransfer(
@@ -608,8 +612,8 @@ def is_valid_lock_expired(
         secrethash in channel_state.partner_state.secrethashes_to_onchain_unlockedlocks
     )
 
-    current_balance_proof = get_current_balanceproof(sender_state)
-    _, _, current_transferred_amount, current_locked_amount = current_balance_proof
+    current_transferred_amount = sender_state.transferred_amount
+    current_locked_amount = get_amount_locked(sender_state)
 
     is_valid_balance_proof = is_balance_proof_usable_onchain(
         received_balance_proof=received_balance_proof,
@@ -701,10 +705,10 @@ def valid_lockedtransfer_check(
     lock: HashTimeLockState,
 ) -> PendingLocksStateOrError:
 
-    current_balance_proof = get_current_balanceproof(sender_state)
     pending_locks = compute_locks_with(sender_state.pending_locks, lock)
 
-    _, _, current_transferred_amount, current_locked_amount = current_balance_proof
+    current_transferred_amount = sender_state.transferred_amount
+    current_locked_amount = get_amount_locked(sender_state)
     distributable = get_distributable(sender_state, receiver_state)
     expected_locked_amount = current_locked_amount + lock.amount
 
@@ -792,19 +796,27 @@ def refund_transfer_matches_transfer(
     if TargetAddress(refund_transfer_sender) == transfer.target:
         return False
 
-    return (
-        transfer.payment_identifier == refund_transfer.payment_identifier
-        and transfer.lock.amount == refund_transfer.lock.amount
-        and transfer.lock.secrethash == refund_transfer.lock.secrethash
-        and transfer.target == refund_transfer.target
-        and transfer.lock.expiration == refund_transfer.lock.expiration
-        and
-        # The refund transfer is not tied to the other direction of the same
-        # channel, it may reach this node through a different route depending
-        # on the path finding strategy
-        # original_receiver == refund_transfer_sender and
-        transfer.token == refund_transfer.token
-    )
+    # The refund transfer is not tied to the other direction of the same
+    # channel, it may reach this node through a different route depending
+    # on the path finding strategy, so the original receiver is not compared
+    # to the refund sender.
+    transfer_key = (
+        transfer.payment_identifier,
+        transfer.lock.amount,
+        transfer.lock.secrethash,
+        transfer.target,
+        transfer.lock.expiration,
+        transfer.token,
+    )
+    refund_key = (
+        refund_transfer.payment_identifier,
+        refund_transfer.lock.amount,
+        refund_transfer.lock.secrethash,
+        refund_transfer.target,
+        refund_transfer.lock.expiration,
+        refund_transfer.token,
+    )
+    return transfer_key == refund_key
 
 
 def is_valid_refund(
@@ -836,7 +848,6 @@ def is_valid_unlock(
     unlock: ReceiveUnlock, channel_state: NettingChannelState, sender_state: NettingChannelEndState
 ) -> PendingLocksStateOrError:
     received_balance_proof = unlock.balance_proof
-    current_balance_proof = get_current_balanceproof(sender_state)
 
     lock = get_lock(sender_state, unlock.secrethash)
 
@@ -856,7 +867,8 @@ def is_valid_unlock(
 
     locksroot_without_lock = compute_locksroot(pending_locks)
 
-    _, _, current_transferred_amount, current_locked_amount = current_balance_proof
+    current_transferred_amount = sender_state.transferred_amount
+    current_locked_amount = get_amount_locked(sender_state)
 
     expected_transferred_amount = current_transferred_amount + TokenAmount(lock.amount)
     expected_locked_amount = current_locked_amount - lock.amount
@@ -942,8 +954,6 @@ def is_valid_withdraw_request(
     expected_nonce = get_next_nonce(channel_state.partner_state)
     balance = get_balance(sender=channel_state.partner_state, receiver=channel_state.our_state)
 
-    is_valid = is_valid_withdraw(withdraw_request)
-
     withdraw_amount = withdraw_request.total_withdraw - channel_state.partner_total_withdraw
 
     withdraw_overflow = not is_valid_channel_total_withdraw(
@@ -976,7 +986,9 @@ def is_valid_withdraw_request(
             f"The new total_withdraw {withdraw_request.total_withdraw} will cause an overflow"
         )
     else:
-        return is_valid
+        # Recovering the signer is the most expensive check, it is only done
+        # once all the fields are known to be valid.
+        return is_valid_withdraw(withdraw_request)
 
 
 def is_valid_withdraw_confirmation(
@@ -998,8 +1010,6 @@ def is_valid_withdraw_confirmation(
 
     expected_nonce = get_next_nonce(channel_state.partner_state)
 
-    is_valid = is_valid_withdraw(received_withdraw)
-
     if not withdraw_state:
         return SuccessOrError(
             f"Received withdraw confirmation {received_withdraw.total_withdraw} "
@@ -1049,7 +1059,7 @@ def is_valid_withdraw_confirmation(
             f"The new total_withdraw {received_withdraw.total_withdraw} will cause an overflow"
         )
     else:
-        return is_valid
+        return is_valid_withdraw(received_withdraw)
 
 
 def is_valid_withdraw_expired(
@@ -1213,11 +1223,13 @@ def get_distributable(
     enforced on transferred_amount + locked_amount to avoid overflows. This is
     an additional security check.
     """
-    _, _, transferred_amount, locked_amount = get_current_balanceproof(sender)
+    # The sum of the locks is computed once, `get_current_balanceproof` would
+    # compute it a second time just to return the same value.
+    locked_amount = get_amount_locked(sender)
 
-    distributable = get_balance(sender, receiver) - get_amount_locked(sender)
+    distributable = get_balance(sender, receiver) - locked_amount
 
-    overflow_limit = max(UINT256_MAX - transferred_amount - locked_amount, 0)
+    overflow_limit = max(UINT256_MAX - sender.transferred_amount - locked_amount, 0)
 
     return TokenAmount(min(overflow_limit, distributable))
 
@@ -1251,7 +1263,6 @@ def get_lock(
         if partial_unlock:
             lock = partial_unlock.lock
 
-    assert isinstance(lock, HashTimeLockState) or lock is None
     return lock
 
 
@@ -1308,11 +1319,8 @@ def get_status(channel_state: NettingChannelState) -> ChannelState:
 
 
 def _del_unclaimed_lock(end_state: NettingChannelEndState, secrethash: SecretHash) -> None:
-    if secrethash in end_state.secrethashes_to_lockedlocks:
-        del end_state.secrethashes_to_lockedlocks[secrethash]
-
-    if secrethash in end_state.secrethashes_to_unlockedlocks:
-        del end_state.secrethashes_to_unlockedlocks[secrethash]
+    end_state.secrethashes_to_lockedlocks.pop(secrethash, None)
+    end_state.secrethashes_to_unlockedlocks.pop(secrethash, None)
 
 
 def _del_lock(end_state: NettingChannelEndState, secrethash: SecretHash) -> None:
@@ -1324,9 +1332,7 @@ def _del_lock(end_state: NettingChannelEndState, secrethash: SecretHash) -> None
     assert is_lock_pending(end_state, secrethash)
 
     _del_unclaimed_lock(end_state, secrethash)
-
-    if secrethash in end_state.secrethashes_to_onchain_unlockedlocks:
-        del end_state.secrethashes_to_onchain_unlockedlocks[secrethash]
+    end_state.secrethashes_to_onchain_unlockedlocks.pop(secrethash, None)
 
 
 def set_closed(channel_state: NettingChannelState, block_number: BlockNumber) -> None:
@@ -1371,14 +1377,16 @@ def compute_locks_with(
 def compute_locks_without(
     locks: PendingLocksState, lock_encoded: EncodedData
 ) -> Optional[PendingLocksState]:
-    # Use None to inform the caller the lock is unknown
-    if lock_encoded in locks.locks:
-        locks = PendingLocksState(list(locks.locks))
-        locks.locks.remove(lock_encoded)
-        return locks
-    else:
+    # Locate the lock once and build the new list around it, instead of a
+    # membership test followed by list.remove which scans the locks twice.
+    try:
+        index = locks.locks.index(lock_encoded)
+    except ValueError:
+        # Use None to inform the caller the lock is unknown
         return None
 
+    return PendingLocksState(locks.locks[:index] + locks.locks[index + 1 :])
+
 
 def compute_locksroot(locks: PendingLocksState) -> Locksroot:
     """ Compute the hash representing all pending locks
@@ -1410,7 +1418,7 @@ def create_sendlockedtransfer(
 
     lock = HashTimeLockState(amount=amount, expiration=expiration, secrethash=secrethash)
 
-    pending_locks = compute_locks_with(channel_state.our_state.pending_locks, lock)
+    pending_locks = compute_locks_with(our_state.pending_locks, lock)
     # The caller must ensure the same lock is not being used twice
     assert pending_locks, "lock is already registered"
 
@@ -1425,11 +1433,11 @@ def create_sendlockedtransfer(
     assert transferred_amount + amount <= UINT256_MAX, msg
 
     token = channel_state.token_address
-    recipient = channel_state.partner_state.address
+    recipient = partner_state.address
     # the new lock is not registered yet
     locked_amount = LockedAmount(get_amount_locked(our_state) + amount)
 
-    nonce = get_next_nonce(channel_state.our_state)
+    nonce = get_next_nonce(our_state)
 
     balance_proof = BalanceProofUnsignedState(
         nonce=nonce,
@@ -1493,7 +1501,7 @@ def create_unlock(
     locked_amount = LockedAmount(get_amount_locked(our_state) - lock.amount)
 
     nonce = get_next_nonce(our_state)
-    channel_state.our_state.nonce = nonce
+    our_state.nonce = nonce
 
     balance_proof = BalanceProofUnsignedState(
         nonce=nonce,
@@ -1541,10 +1549,11 @@ def send_lockedtransfer(
 
     transfer = send_locked_transfer_event.transfer
     lock = transfer.lock
-    channel_state.our_state.balance_proof = transfer.balance_proof
-    channel_state.our_state.nonce = transfer.balance_proof.nonce
-    channel_state.our_state.pending_locks = pending_locks
-    channel_state.our_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
+    our_state = channel_state.our_state
+    our_state.balance_proof = transfer.balance_proof
+    our_state.nonce = transfer.balance_proof.nonce
+    our_state.pending_locks = pending_locks
+    our_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
 
     return send_locked_transfer_event
 
@@ -1581,10 +1590,11 @@ def send_refundtransfer(
     mediated_transfer = send_mediated_transfer.transfer
     lock = mediated_transfer.lock
 
-    channel_state.our_state.balance_proof = mediated_transfer.balance_proof
-    channel_state.our_state.nonce = mediated_transfer.balance_proof.nonce
-    channel_state.our_state.pending_locks = pending_locks
-    channel_state.our_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
+    our_state = channel_state.our_state
+    our_state.balance_proof = mediated_transfer.balance_proof
+    our_state.nonce = mediated_transfer.balance_proof.nonce
+    our_state.pending_locks = pending_locks
+    our_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
 
     refund_transfer = refund_from_sendmediated(send_mediated_transfer)
     return refund_transfer
@@ -1680,9 +1690,7 @@ def create_sendexpiredlock(
     sender_end_state: NettingChannelEndState,
     locked_lock: LockType,
     pseudo_random_generator: random.Random,
-    chain_id: ChainID,
-    token_network_address: TokenNetworkAddress,
-    channel_identifier: ChannelID,
+    canonical_identifier: CanonicalIdentifier,
     recipient: Address,
 ) -> Tuple[Optional[SendLockExpired], Optional[PendingLocksState]]:
     locked_amount = get_amount_locked(sender_end_state)
@@ -1708,11 +1716,7 @@ def create_sendexpiredlock(
         transferred_amount=transferred_amount,
         locked_amount=updated_locked_amount,
         locksroot=locksroot,
-        canonical_identifier=CanonicalIdentifier(
-            chain_identifier=chain_id,
-            token_network_address=token_network_address,
-            channel_identifier=channel_identifier,
-        ),
+        canonical_identifier=canonical_identifier,
     )
 
     send_lock_expired = SendLockExpired(
@@ -1738,9 +1742,7 @@ def send_lock_expired(
         sender_end_state=channel_state.our_state,
         locked_lock=locked_lock,
         pseudo_random_generator=pseudo_random_generator,
-        chain_id=channel_state.chain_id,
-        token_network_address=channel_state.token_network_address,
-        channel_identifier=channel_state.identifier,
+        canonical_identifier=channel_state.canonical_identifier,
         recipient=channel_state.partner_state.address,
     )
 
@@ -1803,10 +1805,9 @@ def send_expired_withdraws(
 def register_secret_endstate(
     end_state: NettingChannelEndState, secret: Secret, secrethash: SecretHash
 ) -> None:
-    if is_lock_locked(end_state, secrethash):
-        pending_lock = end_state.secrethashes_to_lockedlocks[secrethash]
-        del end_state.secrethashes_to_lockedlocks[secrethash]
+    pending_lock = end_state.secrethashes_to_lockedlocks.pop(secrethash, None)
 
+    if pending_lock is not None:
         end_state.secrethashes_to_unlockedlocks[secrethash] = UnlockPartialProofState(
             pending_lock, secret
         )
@@ -1822,13 +1823,13 @@ def register_onchain_secret_endstate(
     # the lock might be in end_state.secrethashes_to_lockedlocks or
     # end_state.secrethashes_to_unlockedlocks
     # It should be removed from both and moved into secrethashes_to_onchain_unlockedlocks
-    pending_lock: Optional[HashTimeLockState] = None
-
-    if is_lock_locked(end_state, secrethash):
-        pending_lock = end_state.secrethashes_to_lockedlocks[secrethash]
+    pending_lock: Optional[HashTimeLockState] = end_state.secrethashes_to_lockedlocks.get(
+        secrethash
+    )
 
-    if secrethash in end_state.secrethashes_to_unlockedlocks:
-        pending_lock = end_state.secrethashes_to_unlockedlocks[secrethash].lock
+    partial_unlock = end_state.secrethashes_to_unlockedlocks.get(secrethash)
+    if partial_unlock is not None:
+        pending_lock = partial_unlock.lock
 
     if pending_lock:
         # If pending lock is still locked or unlocked but unclaimed
@@ -1904,7 +1905,7 @@ def handle_action_withdraw(
     pseudo_random_generator: random.Random,
     block_number: BlockNumber,
 ) -> TransitionResult[NettingChannelState]:
-    events: List[Event] = list()
+    events: List[Event]
     is_valid_withdraw = is_valid_action_withdraw(channel_state, action_withdraw)
 
     if is_valid_withdraw:
@@ -2041,8 +2042,6 @@ def handle_receive_withdraw_expired(
     withdraw_expired: ReceiveWithdrawExpired,
     block_number: BlockNumber,
 ) -> TransitionResult:
-    events: List[Event] = list()
-
     withdraw_state = channel_state.partner_state.withdraws_pending.get(
         withdraw_expired.total_withdraw
     )
@@ -2068,6 +2067,8 @@ def handle_receive_withdraw_expired(
         withdraw_state=withdraw_state,
         block_number=block_number,
     )
+
+    events: List[Event]
     if is_valid:
         del channel_state.partner_state.withdraws_pending[withdraw_state.total_withdraw]
 
@@ -2090,33 +2091,52 @@ def handle_receive_withdraw_expired(
     return TransitionResult(channel_state, events)
 
 
+def _update_partner_balance_proof(
+    channel_state: NettingChannelState,
+    balance_proof: BalanceProofSignedState,
+    pending_locks: PendingLocksState,
+    message_identifier: MessageID,
+) -> SendProcessed:
+    """Store a validated balance proof from the partner and acknowledge the
+    message that carried it.
+    """
+    partner_state = channel_state.partner_state
+    partner_state.balance_proof = balance_proof
+    partner_state.nonce = balance_proof.nonce
+    partner_state.pending_locks = pending_locks
+
+    return SendProcessed(
+        recipient=balance_proof.sender,
+        message_identifier=message_identifier,
+        canonical_identifier=CANONICAL_IDENTIFIER_UNORDERED_QUEUE,
+    )
+
+
 def handle_refundtransfer(
     received_transfer: LockedTransferUnsignedState,
     channel_state: NettingChannelState,
     refund: ReceiveTransferRefund,
 ) -> EventsOrError:
+    partner_state = channel_state.partner_state
     events: List[Event]
     is_valid, msg, pending_locks = is_valid_refund(
         refund=refund,
         channel_state=channel_state,
-        sender_state=channel_state.partner_state,
+        sender_state=partner_state,
         receiver_state=channel_state.our_state,
         received_transfer=received_transfer,
     )
     if is_valid:
         assert pending_locks, "is_valid_refund should return pending locks if valid"
-        channel_state.partner_state.balance_proof = refund.transfer.balance_proof
-        channel_state.partner_state.nonce = refund.transfer.balance_proof.nonce
-        channel_state.partner_state.pending_locks = pending_locks
-
-        lock = refund.transfer.lock
-        channel_state.partner_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
-
-        send_processed = SendProcessed(
-            recipient=refund.transfer.balance_proof.sender,
+        send_processed = _update_partner_balance_proof(
+            channel_state=channel_state,
+            balance_proof=refund.transfer.balance_proof,
+            pending_locks=pending_locks,
             message_identifier=refund.transfer.message_identifier,
-            canonical_identifier=CANONICAL_IDENTIFIER_UNORDERED_QUEUE,
         )
+
+        lock = refund.transfer.lock
+        partner_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
         events = [send_processed]
     else:
         assert msg, "is_valid_refund should return error msg if not valid"
@@ -2132,28 +2152,26 @@ def handle_receive_lock_expired(
     channel_state: NettingChannelState, state_change: ReceiveLockExpired, block_number: BlockNumber
 ) -> TransitionResult[NettingChannelState]:
     """Remove expired locks from channel states."""
+    partner_state = channel_state.partner_state
     is_valid, msg, pending_locks = is_valid_lock_expired(
         state_change=state_change,
         channel_state=channel_state,
-        sender_state=channel_state.partner_state,
+        sender_state=partner_state,
         receiver_state=channel_state.our_state,
         block_number=block_number,
     )
 
-    events: List[Event] = list()
+    events: List[Event]
     if is_valid:
         assert pending_locks, "is_valid_lock_expired should return pending locks if valid"
-        channel_state.partner_state.balance_proof = state_change.balance_proof
-        channel_state.partner_state.nonce = state_change.balance_proof.nonce
-        channel_state.partner_state.pending_locks = pending_locks
-
-        _del_unclaimed_lock(channel_state.partner_state, state_change.secrethash)
-
-        send_processed = SendProcessed(
-            recipient=state_change.balance_proof.sender,
+        send_processed = _update_partner_balance_proof(
+            channel_state=channel_state,
+            balance_proof=state_change.balance_proof,
+            pending_locks=pending_locks,
             message_identifier=state_change.message_identifier,
-            canonical_identifier=CANONICAL_IDENTIFIER_UNORDERED_QUEUE,
         )
+
+        _del_unclaimed_lock(partner_state, state_change.secrethash)
         events = [send_processed]
     else:
         assert msg, "is_valid_lock_expired should return error msg if not valid"
@@ -2175,25 +2193,23 @@ def handle_receive_lockedtransfer(
     transfer. The receiver needs to ensure that the locksroot has the
     secrethash included, otherwise it won't be able to claim it.
     """
+    partner_state = channel_state.partner_state
     events: List[Event]
     is_valid, msg, pending_locks = is_valid_lockedtransfer(
-        mediated_transfer, channel_state, channel_state.partner_state, channel_state.our_state
+        mediated_transfer, channel_state, partner_state, channel_state.our_state
     )
 
     if is_valid:
         assert pending_locks, "is_valid_lock_expired should return pending locks if valid"
-        channel_state.partner_state.balance_proof = mediated_transfer.balance_proof
-        channel_state.partner_state.nonce = mediated_transfer.balance_proof.nonce
-        channel_state.partner_state.pending_locks = pending_locks
-
-        lock = mediated_transfer.lock
-        channel_state.partner_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
-
-        send_processed = SendProcessed(
-            recipient=mediated_transfer.balance_proof.sender,
+        send_processed = _update_partner_balance_proof(
+            channel_state=channel_state,
+            balance_proof=mediated_transfer.balance_proof,
+            pending_locks=pending_locks,
             message_identifier=mediated_transfer.message_identifier,
-            canonical_identifier=CANONICAL_IDENTIFIER_UNORDERED_QUEUE,
         )
+
+        lock = mediated_transfer.lock
+        partner_state.secrethashes_to_lockedlocks[lock.secrethash] = lock
         events = [send_processed]
     else:
         assert msg, "is_valid_lock_expired should return error msg if not valid"
@@ -2206,25 +2222,21 @@ def handle_receive_lockedtransfer(
 
 
 def handle_unlock(channel_state: NettingChannelState, unlock: ReceiveUnlock) -> EventsOrError:
-    is_valid, msg, unlocked_pending_locks = is_valid_unlock(
-        unlock, channel_state, channel_state.partner_state
-    )
+    partner_state = channel_state.partner_state
+    is_valid, msg, unlocked_pending_locks = is_valid_unlock(unlock, channel_state, partner_state)
 
     if is_valid:
         assert (
             unlocked_pending_locks is not None
         ), "is_valid_unlock should return pending locks if valid"
-        channel_state.partner_state.balance_proof = unlock.balance_proof
-        channel_state.partner_state.nonce = unlock.balance_proof.nonce
-        channel_state.partner_state.pending_locks = unlocked_pending_locks
-
-        _del_lock(channel_state.partner_state, unlock.secrethash)
-
-        send_processed = SendProcessed(
-            recipient=unlock.balance_proof.sender,
+        send_processed = _update_partner_balance_proof(
+            channel_state=channel_state,
+            balance_proof=unlock.balance_proof,
+            pending_locks=unlocked_pending_locks,
             message_identifier=unlock.message_identifier,
-            canonical_identifier=CANONICAL_IDENTIFIER_UNORDERED_QUEUE,
         )
+
+        _del_lock(partner_state, unlock.secrethash)
         events: List[Event] = [send_processed]
     else:
         assert msg, "is_valid_unlock should return error msg if not valid"
@@ -2243,16 +2255,16 @@ def handle_block(
     assert state_change.block_number == block_number
 
     events: List[Event] = list()
+    channel_status = get_status(channel_state)
 
-    if get_status(channel_state) == ChannelState.STATE_OPENED:
+    if channel_status == ChannelState.STATE_OPENED:
         expired_withdraws = send_expired_withdraws(
             channel_state=channel_state,
             block_number=block_number,
             pseudo_random_generator=pseudo_random_generator,
         )
         events.extend(expired_withdraws)
-
-    if get_status(channel_state) == ChannelState.STATE_CLOSED:
+    elif channel_status == ChannelState.STATE_CLOSED:
         msg = "channel get_status is STATE_CLOSED, but close_transaction is not set"
         assert channel_state.close_transaction, msg
         msg = "channel get_status is STATE_CLOSED, but close_transaction block number is missing"
@@ -2277,39 +2289,37 @@ def handle_block(
 def handle_channel_closed(
     channel_state: NettingChannelState, state_change: ContractReceiveChannelClosed
 ) -> TransitionResult[NettingChannelState]:
-    events: List[Event] = list()
-
     just_closed = (
         state_change.channel_identifier == channel_state.identifier
         and get_status(channel_state) in CHANNEL_STATES_PRIOR_TO_CLOSED
     )
+    if not just_closed:
+        return TransitionResult(channel_state, list())
 
-    if just_closed:
-        set_closed(channel_state, state_change.block_number)
-
-        balance_proof = channel_state.partner_state.balance_proof
-        call_update = (
-            state_change.transaction_from != channel_state.our_state.address
-            and balance_proof is not None
-            and channel_state.update_transaction is None
+    events: List[Event] = list()
+    set_closed(channel_state, state_change.block_number)
+
+    balance_proof = channel_state.partner_state.balance_proof
+    call_update = (
+        state_change.transaction_from != channel_state.our_state.address
+        and balance_proof is not None
+        and channel_state.update_transaction is None
+    )
+    if call_update:
+        expiration = BlockExpiration(state_change.block_number + channel_state.settle_timeout)
+        # silence mypy: partner's balance proof is always signed
+        assert isinstance(balance_proof, BalanceProofSignedState)
+        # The channel was closed by our partner, if there is a balance
+        # proof available update this node half of the state
+        update = ContractSendChannelUpdateTransfer(
+            expiration=expiration,
+            balance_proof=balance_proof,
+            triggered_by_block_hash=state_change.block_hash,
         )
-        if call_update:
-            expiration = BlockExpiration(state_change.block_number + channel_state.settle_timeout)
-            # silence mypy: partner's balance proof is always signed
-            assert isinstance(balance_proof, BalanceProofSignedState)
-            # The channel was closed by our partner, if there is a balance
-            # proof available update this node half of the state
-            update = ContractSendChannelUpdateTransfer(
-                expiration=expiration,
-                balance_proof=balance_proof,
-                triggered_by_block_hash=state_change.block_hash,
-            )
-            channel_state.update_transaction = TransactionExecutionStatus(
-                started_block_number=state_change.block_number,
-                finished_block_number=None,
-                result=None,
-            )
-            events.append(update)
+        channel_state.update_transaction = TransactionExecutionStatus(
+            started_block_number=state_change.block_number, finished_block_number=None, result=None
+        )
+        events.append(update)
 
     return TransitionResult(channel_state, events)
 
@@ -2333,32 +2343,31 @@ def handle_channel_updated_transfer(
 def handle_channel_settled(
     channel_state: NettingChannelState, state_change: ContractReceiveChannelSettled
 ) -> TransitionResult[Optional[NettingChannelState]]:
-    events: List[Event] = list()
+    if state_change.channel_identifier != channel_state.identifier:
+        return TransitionResult(channel_state, list())
 
-    if state_change.channel_identifier == channel_state.identifier:
-        set_settled(channel_state, state_change.block_number)
+    set_settled(channel_state, state_change.block_number)
 
-        our_locksroot = state_change.our_onchain_locksroot
-        partner_locksroot = state_change.partner_onchain_locksroot
+    our_locksroot = state_change.our_onchain_locksroot
+    partner_locksroot = state_change.partner_onchain_locksroot
 
-        should_clear_channel = (
-            our_locksroot == LOCKSROOT_OF_NO_LOCKS and partner_locksroot == LOCKSROOT_OF_NO_LOCKS
-        )
+    should_clear_channel = (
+        our_locksroot == LOCKSROOT_OF_NO_LOCKS and partner_locksroot == LOCKSROOT_OF_NO_LOCKS
+    )
 
-        if should_clear_channel:
-            return TransitionResult(None, events)
+    if should_clear_channel:
+        return TransitionResult(None, list())
 
-        channel_state.our_state.onchain_locksroot = our_locksroot
-        channel_state.partner_state.onchain_locksroot = partner_locksroot
+    channel_state.our_state.onchain_locksroot = our_locksroot
+    channel_state.partner_state.onchain_locksroot = partner_locksroot
 
-        onchain_unlock = ContractSendChannelBatchUnlock(
-            canonical_identifier=channel_state.canonical_identifier,
-            sender=channel_state.partner_state.address,
-            triggered_by_block_hash=state_change.block_hash,
-        )
-        events.append(onchain_unlock)
+    onchain_unlock = ContractSendChannelBatchUnlock(
+        canonical_identifier=channel_state.canonical_identifier,
+        sender=channel_state.partner_state.address,
+        triggered_by_block_hash=state_change.block_hash,
+    )
 
-    return TransitionResult(channel_state, events)
+    return TransitionResult(channel_state, [onchain_unlock])
 
 
 def update_fee_schedule_after_balance_change(
@@ -2427,8 +2436,6 @@ def handle_channel_withdraw(
 def handle_channel_batch_unlock(
     channel_state: NettingChannelState, state_change: ContractReceiveChannelBatchUnlock
 ) -> TransitionResult[Optional[NettingChannelState]]:
-    events: List[Event] = list()
-
     new_channel_state: Optional[NettingChannelState] = channel_state
     # Unlock is allowed by the smart contract only on a settled channel.
     # Ignore the unlock if the channel was not closed yet.
@@ -2444,14 +2451,15 @@ def handle_channel_batch_unlock(
             partner_state.onchain_locksroot = Locksroot(LOCKSROOT_OF_NO_LOCKS)
 
         # only clear the channel state once all unlocks have been done
-        no_unlock_left_to_do = our_state.onchain_locksroot == Locksroot(
-            LOCKSROOT_OF_NO_LOCKS
-        ) and partner_state.onchain_locksroot == Locksroot(LOCKSROOT_OF_NO_LOCKS)
+        no_unlock_left_to_do = (
+            our_state.onchain_locksroot == LOCKSROOT_OF_NO_LOCKS
+            and partner_state.onchain_locksroot == LOCKSROOT_OF_NO_LOCKS
+        )
 
         if no_unlock_left_to_do:
             new_channel_state = None
 
-    return TransitionResult(new_channel_state, events)
+    return TransitionResult(new_channel_state, list())
 
 
 def sanity_check(channel_state: NettingChannelState) -> None:
@@ -2535,82 +2543,202 @@ def sanity_check(channel_state: NettingChannelState) -> None:
         assert partial_unlock.encoded in our_state.pending_locks.locks, msg
 
 
-def state_transition(
+# The adapters below give every handler the signature of `state_transition`,
+# each one takes the concrete state change type it is registered for.
+ChannelStateTransition = Callable[
+    [NettingChannelState, Any, BlockNumber, BlockHash, random.Random],
+    TransitionResult[Optional[NettingChannelState]],
+]
+
+# pylint: disable=unused-argument
+
+
+def _transition_block(
     channel_state: NettingChannelState,
-    state_change: StateChange,
+    state_change: Block,
     block_number: BlockNumber,
     block_hash: BlockHash,
     pseudo_random_generator: random.Random,
-) -> TransitionResult[Optional[NettingChannelState]]:  # pragma: no unittest
-    # pylint: disable=too-many-branches,unidiomatic-typecheck
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_block(channel_state, state_change, block_number, pseudo_random_generator)
 
-    events: List[Event] = list()
-    iteration: TransitionResult[Optional[NettingChannelState]] = TransitionResult(
-        channel_state, events
+
+def _transition_action_close(
+    channel_state: NettingChannelState,
+    state_change: ActionChannelClose,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_action_close(
+        channel_state=channel_state,
+        close=state_change,
+        block_number=block_number,
+        block_hash=block_hash,
     )
 
-    if type(state_change) == Block:
-        assert isinstance(state_change, Block), MYPY_ANNOTATION
-        iteration = handle_block(
-            channel_state, state_change, block_number, pseudo_random_generator
-        )
-    elif type(state_change) == ActionChannelClose:
-        assert isinstance(state_change, ActionChannelClose), MYPY_ANNOTATION
-        iteration = handle_action_close(
-            channel_state=channel_state,
-            close=state_change,
-            block_number=block_number,
-            block_hash=block_hash,
-        )
-    elif type(state_change) == ActionChannelWithdraw:
-        assert isinstance(state_change, ActionChannelWithdraw), MYPY_ANNOTATION
-        iteration = handle_action_withdraw(
-            channel_state=channel_state,
-            action_withdraw=state_change,
-            pseudo_random_generator=pseudo_random_generator,
-            block_number=block_number,
-        )
-    elif type(state_change) == ActionChannelSetRevealTimeout:
-        assert isinstance(state_change, ActionChannelSetRevealTimeout), MYPY_ANNOTATION
-        iteration = handle_action_set_reveal_timeout(
-            channel_state=channel_state, state_change=state_change
-        )
-    elif type(state_change) == ContractReceiveChannelClosed:
-        assert isinstance(state_change, ContractReceiveChannelClosed), MYPY_ANNOTATION
-        iteration = handle_channel_closed(channel_state, state_change)
-    elif type(state_change) == ContractReceiveUpdateTransfer:
-        assert isinstance(state_change, ContractReceiveUpdateTransfer), MYPY_ANNOTATION
-        iteration = handle_channel_updated_transfer(channel_state, state_change, block_number)
-    elif type(state_change) == ContractReceiveChannelSettled:
-        assert isinstance(state_change, ContractReceiveChannelSettled), MYPY_ANNOTATION
-        iteration = handle_channel_settled(channel_state, state_change)
-    elif type(state_change) == ContractReceiveChannelDeposit:
-        assert isinstance(state_change, ContractReceiveChannelDeposit), MYPY_ANNOTATION
-        iteration = handle_channel_deposit(channel_state, state_change)
-    elif type(state_change) == ContractReceiveChannelBatchUnlock:
-        assert isinstance(state_change, ContractReceiveChannelBatchUnlock), MYPY_ANNOTATION
-        iteration = handle_channel_batch_unlock(channel_state, state_change)
-    elif type(state_change) == ContractReceiveChannelWithdraw:
-        assert isinstance(state_change, ContractReceiveChannelWithdraw), MYPY_ANNOTATION
-        iteration = handle_channel_withdraw(channel_state=channel_state, state_change=state_change)
-    elif type(state_change) == ReceiveWithdrawRequest:
-        assert isinstance(state_change, ReceiveWithdrawRequest), MYPY_ANNOTATION
-        iteration = handle_receive_withdraw_request(
-            channel_state=channel_state, withdraw_request=state_change
-        )
-    elif type(state_change) == ReceiveWithdrawConfirmation:
-        assert isinstance(state_change, ReceiveWithdrawConfirmation), MYPY_ANNOTATION
-        iteration = handle_receive_withdraw_confirmation(
-            channel_state=channel_state,
-            withdraw=state_change,
-            block_number=block_number,
-            block_hash=block_hash,
-        )
-    elif type(state_change) == ReceiveWithdrawExpired:
-        assert isinstance(state_change, ReceiveWithdrawExpired), MYPY_ANNOTATION
-        iteration = handle_receive_withdraw_expired(
-            channel_state=channel_state, withdraw_expired=state_change, block_number=block_number
+
+def _transition_action_withdraw(
+    channel_state: NettingChannelState,
+    state_change: ActionChannelWithdraw,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_action_withdraw(
+        channel_state=channel_state,
+        action_withdraw=state_change,
+        pseudo_random_generator=pseudo_random_generator,
+        block_number=block_number,
+    )
+
+
+def _transition_action_set_reveal_timeout(
+    channel_state: NettingChannelState,
+    state_change: ActionChannelSetRevealTimeout,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_action_set_reveal_timeout(channel_state=channel_state, state_change=state_change)
+
+
+def _transition_channel_closed(
+    channel_state: NettingChannelState,
+    state_change: ContractReceiveChannelClosed,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_channel_closed(channel_state, state_change)
+
+
+def _transition_channel_updated_transfer(
+    channel_state: NettingChannelState,
+    state_change: ContractReceiveUpdateTransfer,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_channel_updated_transfer(channel_state, state_change, block_number)
+
+
+def _transition_channel_settled(
+    channel_state: NettingChannelState,
+    state_change: ContractReceiveChannelSettled,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_channel_settled(channel_state, state_change)
+
+
+def _transition_channel_deposit(
+    channel_state: NettingChannelState,
+    state_change: ContractReceiveChannelDeposit,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_channel_deposit(channel_state, state_change)
+
+
+def _transition_channel_batch_unlock(
+    channel_state: NettingChannelState,
+    state_change: ContractReceiveChannelBatchUnlock,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_channel_batch_unlock(channel_state, state_change)
+
+
+def _transition_channel_withdraw(
+    channel_state: NettingChannelState,
+    state_change: ContractReceiveChannelWithdraw,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_channel_withdraw(channel_state=channel_state, state_change=state_change)
+
+
+def _transition_receive_withdraw_request(
+    channel_state: NettingChannelState,
+    state_change: ReceiveWithdrawRequest,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_receive_withdraw_request(
+        channel_state=channel_state, withdraw_request=state_change
+    )
+
+
+def _transition_receive_withdraw_confirmation(
+    channel_state: NettingChannelState,
+    state_change: ReceiveWithdrawConfirmation,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_receive_withdraw_confirmation(
+        channel_state=channel_state,
+        withdraw=state_change,
+        block_number=block_number,
+        block_hash=block_hash,
+    )
+
+
+def _transition_receive_withdraw_expired(
+    channel_state: NettingChannelState,
+    state_change: ReceiveWithdrawExpired,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    return handle_receive_withdraw_expired(
+        channel_state=channel_state, withdraw_expired=state_change, block_number=block_number
+    )
+
+
+# pylint: enable=unused-argument
+
+# Dispatch table for `state_transition`, keyed by the exact type of the state
+# change.
+STATE_CHANGE_HANDLERS: Dict[Type[StateChange], ChannelStateTransition] = {
+    Block: _transition_block,
+    ActionChannelClose: _transition_action_close,
+    ActionChannelWithdraw: _transition_action_withdraw,
+    ActionChannelSetRevealTimeout: _transition_action_set_reveal_timeout,
+    ContractReceiveChannelClosed: _transition_channel_closed,
+    ContractReceiveUpdateTransfer: _transition_channel_updated_transfer,
+    ContractReceiveChannelSettled: _transition_channel_settled,
+    ContractReceiveChannelDeposit: _transition_channel_deposit,
+    ContractReceiveChannelBatchUnlock: _transition_channel_batch_unlock,
+    ContractReceiveChannelWithdraw: _transition_channel_withdraw,
+    ReceiveWithdrawRequest: _transition_receive_withdraw_request,
+    ReceiveWithdrawConfirmation: _transition_receive_withdraw_confirmation,
+    ReceiveWithdrawExpired: _transition_receive_withdraw_expired,
+}
+
+
+def state_transition(
+    channel_state: NettingChannelState,
+    state_change: StateChange,
+    block_number: BlockNumber,
+    block_hash: BlockHash,
+    pseudo_random_generator: random.Random,
+) -> TransitionResult[Optional[NettingChannelState]]:
+    iteration: TransitionResult[Optional[NettingChannelState]]
+
+    handler = STATE_CHANGE_HANDLERS.get(type(state_change))
+    if handler is not None:
+        iteration = handler(
+            channel_state, state_change, block_number, block_hash, pseudo_random_generator
         )
+    else:
+        iteration = TransitionResult(channel_state, list())
 
     if iteration.new_state is not None:
         sanity_check(iteration.new_state)
@@ -1,5 +1,6 @@
+import inspect
 import signal
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Tuple
 
 import gevent
 import gevent.monkey
@@ -18,16 +19,25 @@
 
 log = structlog.get_logger(__name__)
 
+# The CLI options are a superset of the arguments `run_app` uses, only these
+# are forwarded to it.
+RUN_APP_PARAMETERS: FrozenSet[str] = frozenset(
+    name
+    for name, parameter in inspect.signature(run_app).parameters.items()
+    if parameter.kind != inspect.Parameter.VAR_KEYWORD
+)
+
 
 class NodeRunner:
     def __init__(self, options: Dict[str, Any], ctx: Context) -> None:
         self._options = options
         self._ctx = ctx
         self.raiden_api: Optional[RaidenAPI] = None
+        self._system_spec = get_system_spec()
 
     @property
     def welcome_string(self) -> str:
-        return f"Welcome to Raiden, version {get_system_spec()['raiden']}!"
+        return f"Welcome to Raiden, version {self._system_spec['raiden']}!"
 
     def run(self) -> None:
         configure_logging(
@@ -38,7 +48,7 @@ def run(self) -> None:
             debug_log_file_path=self._options["debug_logfile_path"],
         )
 
-        log.info("Starting Raiden", **get_system_spec())
+        log.info("Starting Raiden", **self._system_spec)
 
         if self._options["config_file"]:
             log.debug("Using config file", config_file=self._options["config_file"])
@@ -52,7 +62,9 @@ def _start_services(self) -> None:
             dump_module("settings", settings)
             dump_module("constants", constants)
 
-        app = run_app(**self._options)
+        app = run_app(
+            **{name: value for name, value in self._options.items() if name in RUN_APP_PARAMETERS}
+        )
 
         gevent_tasks: List[gevent.Greenlet] = list()
 
@@ -64,37 +76,34 @@ def _start_services(self) -> None:
 
             gevent_tasks.append(console)
 
-        gevent_tasks.append(
-            spawn_named("check_version", check_version, get_system_spec()["raiden"])
-        )
-        gevent_tasks.append(spawn_named("check_gas_reserve", check_gas_reserve, app.raiden))
-        gevent_tasks.append(
-            spawn_named(
+        tasks_to_spawn: List[Tuple[str, Callable, Tuple[Any, ...]]] = [
+            ("check_version", check_version, (self._system_spec["raiden"],)),
+            ("check_gas_reserve", check_gas_reserve, (app.raiden,)),
+            (
                 "check_network_id",
                 check_network_id,
-                app.raiden.rpc_client.chain_id,
-                app.raiden.rpc_client.web3,
-            )
-        )
+                (app.raiden.rpc_client.chain_id, app.raiden.rpc_client.web3),
+            ),
+        ]
 
         spawn_user_deposit_task = app.user_deposit and (
             self._options["pathfinding_service_address"] or self._options["enable_monitoring"]
         )
         if spawn_user_deposit_task:
-            gevent_tasks.append(
-                spawn_named("check_rdn_deposits", check_rdn_deposits, app.raiden, app.user_deposit)
+            tasks_to_spawn.append(
+                ("check_rdn_deposits", check_rdn_deposits, (app.raiden, app.user_deposit))
             )
 
+        gevent_tasks.extend(spawn_named(name, task, *args) for name, task, args in tasks_to_spawn)
+
         stop_event: AsyncResult[Optional[signal.Signals]]  # pylint: disable=no-member
         stop_event = AsyncResult()
 
         def sig_set(sig: int, _frame: Any = None) -> None:
             stop_event.set(signal.Signals(sig))  # pylint: disable=no-member
 
-        gevent.signal.signal(signal.SIGQUIT, sig_set)  # pylint: disable=no-member
-        gevent.signal.signal(signal.SIGTERM, sig_set)  # pylint: disable=no-member
-        gevent.signal.signal(signal.SIGINT, sig_set)  # pylint: disable=no-member
-        gevent.signal.signal(signal.SIGPIPE, sig_set)  # pylint: disable=no-member
+        for sig in (signal.SIGQUIT, signal.SIGTERM, signal.SIGINT, signal.SIGPIPE):
+            gevent.signal.signal(sig, sig_set)  # pylint: disable=no-member
 
         # quit if any task exits, successfully or not
         app.raiden.greenlet.link(stop_event)
@@ -105,7 +114,7 @@ def sig_set(sig: int, _frame: Any = None) -> None:
             signal_received = stop_event.get()
             if signal_received:
                 print("\r", end="")  # Reset cursor to overwrite a possibly printed "^C"
-                log.info(f"Signal received. Shutting down.", signal=signal_received)
+                log.info("Signal received. Shutting down.", signal=signal_received)
         finally:
             for task in gevent_tasks:
                 task.kill()
@@ -113,7 +122,7 @@ def sig_set(sig: int, _frame: Any = None) -> None:
             app.raiden.stop()
 
             gevent.joinall(
-                set(gevent_tasks + [app.raiden]), app.config.shutdown_timeout, raise_error=True
+                gevent_tasks + [app.raiden], app.config.shutdown_timeout, raise_error=True
             )
 
             app.stop()